@@ -1,21 +1,29 @@
-import json
 import os
-import re
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-import psycopg2
-import psycopg2.extras
+import asyncpg
+import orjson
+from cachetools import TTLCache
 from fastapi import Body, FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+
+from app.core.settings import DATABASE_URL, DB_POOL_MAX_SIZE, DB_POOL_MIN_SIZE
 
 
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = int(os.getenv("DB_PORT", "5432"))
-DB_NAME = os.getenv("POSTGRES_DB", "spatial_asset_manager")
-DB_USER = os.getenv("POSTGRES_USER", "sam")
-DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "sam_password")
 STAC_BASE_PATH = os.getenv("STAC_BASE_PATH", "/stac")
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_NAIVE_UTC
+    | orjson.OPT_UTC_Z
+)
+
+
+class STACResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
 
 
 app = FastAPI(
@@ -23,68 +31,104 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url=None,
     openapi_url=f"{STAC_BASE_PATH}/openapi.json",
+    default_response_class=STACResponse,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+pool: Optional[asyncpg.Pool] = None
 
 CONFORMANCE_CLASSES = [
     "https://api.stacspec.org/v1.0.0/core",
     "https://api.stacspec.org/v1.0.0/collections",
     "https://api.stacspec.org/v1.0.0/item-search",
 ]
+CONFORMANCE_BYTES = orjson.dumps({"conformsTo": CONFORMANCE_CLASSES})
+
+# Serialized landing pages keyed by (base_url, api_path); collections are
+# picked up again once an entry expires.
+LANDING_CACHE: TTLCache = TTLCache(maxsize=32, ttl=60)
+
+# Every filter is always bound (NULL when unused) so asyncpg's per-connection
+# statement cache reuses a single prepared statement for all item queries.
+ITEMS_SQL = """
+    SELECT id, collection_id, stac_version, stac_extensions, datetime,
+           ST_AsGeoJSON(geom)::json AS geom,
+           bbox, properties, assets, links
+    FROM items
+    WHERE ($1::text IS NULL OR collection_id = $1)
+      AND ($2::text IS NULL OR properties->>'year' = $2)
+      AND ($3::text IS NULL OR lower(properties->>'region') LIKE lower($3))
+      AND ($4::text IS NULL OR properties->>'zone' = $4)
+      AND ($5::float8 IS NULL OR geom && ST_MakeEnvelope($5, $6, $7, $8, 4326))
+    ORDER BY id
+    LIMIT $9
+"""
+
+# The item extent is only aggregated for collections without a stored extent.
+COLLECTIONS_SQL = """
+    SELECT c.id, c.title, c.description, c.stac_version, c.stac_extensions, c.links, c.extent,
+           ST_XMin(e.ext) AS xmin, ST_YMin(e.ext) AS ymin,
+           ST_XMax(e.ext) AS xmax, ST_YMax(e.ext) AS ymax,
+           e.min_dt, e.max_dt
+    FROM collections c
+    LEFT JOIN LATERAL (
+        SELECT ST_Extent(geom) AS ext,
+               MIN(datetime) AS min_dt,
+               MAX(datetime) AS max_dt
+        FROM items
+        WHERE collection_id = c.id AND c.extent IS NULL
+    ) e ON TRUE
+"""
 
-def get_conn():
-    return psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
 
+def encode_json(value: Any) -> str:
+    return orjson.dumps(value).decode()
 
-def parse_box(extent: Optional[str]) -> Optional[List[float]]:
-    if not extent:
-        return None
-    match = re.match(r"BOX\\(([-\\d\\.]+) ([-\\d\\.]+),([-\\d\\.]+) ([-\\d\\.]+)\\)", extent)
-    if not match:
-        return None
-    minx, miny, maxx, maxy = map(float, match.groups())
-    return [minx, miny, maxx, maxy]
-
-
-def format_datetime(value: Optional[datetime]) -> Optional[str]:
-    if value is None:
-        return None
-    return value.replace(tzinfo=None).isoformat() + "Z"
-
-
-def collection_extent(conn, collection_id: str) -> Dict[str, Any]:
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT ST_Extent(geom) AS bbox,
-                   MIN(datetime) AS min_dt,
-                   MAX(datetime) AS max_dt
-            FROM items
-            WHERE collection_id = %s
-            """,
-            (collection_id,),
+
+async def init_connection(conn: asyncpg.Connection) -> None:
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(
+            typename, encoder=encode_json, decoder=orjson.loads, schema="pg_catalog"
         )
-        row = cur.fetchone()
-    bbox = parse_box(row[0]) if row else None
-    min_dt = format_datetime(row[1]) if row else None
-    max_dt = format_datetime(row[2]) if row else None
-    if not bbox:
+
+
+@app.on_event("startup")
+async def open_pool() -> None:
+    global pool
+    pool = await asyncpg.create_pool(
+        DATABASE_URL,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=300,
+        init=init_connection,
+        # The NULL-guarded filters in ITEMS_SQL only prune to index scans in a
+        # custom plan; keep Postgres from switching the cached statement to a
+        # generic one.
+        server_settings={"plan_cache_mode": "force_custom_plan"},
+    )
+
+
+@app.on_event("shutdown")
+async def close_pool() -> None:
+    if pool is not None:
+        await pool.close()
+
+
+def collection_extent(row: asyncpg.Record) -> Dict[str, Any]:
+    if row["xmin"] is None:
         bbox = [-180.0, -90.0, 180.0, 90.0]
+    else:
+        bbox = [row["xmin"], row["ymin"], row["xmax"], row["ymax"]]
     return {
         "spatial": {"bbox": [bbox]},
-        "temporal": {"interval": [[min_dt, max_dt]]},
+        "temporal": {"interval": [[row["min_dt"], row["max_dt"]]]},
     }
 
 
-def row_to_collection(conn, row: Dict[str, Any]) -> Dict[str, Any]:
+def row_to_collection(row: asyncpg.Record) -> Dict[str, Any]:
     extent = row.get("extent")
     if not extent:
-        extent = collection_extent(conn, row["id"])
+        extent = collection_extent(row)
     return {
         "type": "Collection",
         "id": row["id"],
@@ -98,41 +142,55 @@ def row_to_collection(conn, row: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def row_to_item(row: Dict[str, Any]) -> Dict[str, Any]:
-    geom = json.loads(row["geom"]) if row.get("geom") else None
-    properties = row.get("properties") or {}
-    if not properties.get("datetime") and row.get("datetime"):
-        properties["datetime"] = format_datetime(row["datetime"])
+def row_to_item(row: asyncpg.Record) -> Dict[str, Any]:
+    (
+        item_id,
+        collection_id,
+        stac_version,
+        stac_extensions,
+        dt,
+        geom,
+        bbox,
+        properties,
+        assets,
+        links,
+    ) = row
+    if properties is None:
+        properties = {}
+    if dt and not properties.get("datetime"):
+        properties["datetime"] = dt
     return {
         "type": "Feature",
-        "stac_version": row.get("stac_version", "1.0.0"),
-        "stac_extensions": row.get("stac_extensions") or [],
-        "id": row["id"],
-        "collection": row["collection_id"],
+        "stac_version": stac_version,
+        "stac_extensions": stac_extensions or [],
+        "id": item_id,
+        "collection": collection_id,
         "geometry": geom,
-        "bbox": row.get("bbox"),
+        "bbox": bbox,
         "properties": properties,
-        "assets": row.get("assets") or {},
-        "links": row.get("links") or [],
+        "assets": assets or {},
+        "links": links or [],
     }
 
 
-def build_landing(base: str, api_path: str) -> Dict[str, Any]:
+async def build_landing(base: str, api_path: str) -> Tuple[Dict[str, Any], bool]:
     child_links: List[Dict[str, Any]] = []
+    complete = True
     try:
-        with get_conn() as conn, conn.cursor() as cur:
-            cur.execute("SELECT id FROM collections ORDER BY id")
-            for (cid,) in cur.fetchall():
-                child_links.append(
-                    {
-                        "rel": "child",
-                        "href": f"{base}{api_path}/collections/{cid}",
-                        "type": "application/json",
-                    }
-                )
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT id FROM collections ORDER BY id")
+        for (cid,) in rows:
+            child_links.append(
+                {
+                    "rel": "child",
+                    "href": f"{base}{api_path}/collections/{cid}",
+                    "type": "application/json",
+                }
+            )
     except Exception:
         child_links = []
-    return {
+        complete = False
+    catalog = {
         "type": "Catalog",
         "stac_version": "1.0.0",
         "id": "spatial-asset-manager",
@@ -178,49 +236,63 @@ def build_landing(base: str, api_path: str) -> Dict[str, Any]:
         ]
         + child_links,
     }
+    return catalog, complete
+
+
+async def landing_bytes(base: str, api_path: str) -> bytes:
+    key = (base, api_path)
+    body = LANDING_CACHE.get(key)
+    if body is None:
+        catalog, complete = await build_landing(base, api_path)
+        body = orjson.dumps(catalog, option=ORJSON_OPTIONS)
+        # A page built without its collections is served but not cached.
+        if complete:
+            LANDING_CACHE[key] = body
+    return body
 
 
 @app.get(STAC_BASE_PATH)
-def landing(request: Request) -> Dict[str, Any]:
+async def landing(request: Request) -> Response:
     base = str(request.base_url).rstrip("/")
-    return build_landing(base, STAC_BASE_PATH)
+    return Response(await landing_bytes(base, STAC_BASE_PATH), media_type="application/json")
 
 
 @app.get(f"{STAC_BASE_PATH}/", include_in_schema=False)
-def landing_slash(request: Request) -> Dict[str, Any]:
-    return landing(request)
+async def landing_slash(request: Request) -> Response:
+    return await landing(request)
 
 
 @app.get("/", include_in_schema=False)
-def landing_root(request: Request) -> Dict[str, Any]:
+async def landing_root(request: Request) -> Response:
     base = str(request.base_url).rstrip("/")
-    return build_landing(base, "")
+    return Response(await landing_bytes(base, ""), media_type="application/json")
 
 
 @app.get(f"{STAC_BASE_PATH}/conformance")
-def conformance() -> Dict[str, Any]:
-    return {"conformsTo": CONFORMANCE_CLASSES}
+async def conformance() -> Response:
+    return Response(CONFORMANCE_BYTES, media_type="application/json")
 
 
 @app.get("/conformance", include_in_schema=False)
-def conformance_root() -> Dict[str, Any]:
-    return conformance()
+async def conformance_root() -> Response:
+    return await conformance()
+
+
+@lru_cache(maxsize=1)
+def openapi_bytes() -> bytes:
+    return orjson.dumps(app.openapi())
 
 
 @app.get("/openapi.json", include_in_schema=False)
-def openapi_root() -> JSONResponse:
-    return JSONResponse(app.openapi())
+async def openapi_root() -> Response:
+    return Response(openapi_bytes(), media_type="application/json")
 
 
 @app.get(f"{STAC_BASE_PATH}/collections")
-def list_collections(request: Request) -> Dict[str, Any]:
-    with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute("SELECT id, title, description, stac_version, stac_extensions, links, extent FROM collections")
-        rows = cur.fetchall()
-        collections = []
-        for row in rows:
-            collection = row_to_collection(conn, row)
-            collections.append(collection)
+async def list_collections(request: Request) -> STACResponse:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(COLLECTIONS_SQL)
+    collections = [row_to_collection(row) for row in rows]
     base = str(request.base_url).rstrip("/")
     for collection in collections:
         cid = collection["id"]
@@ -241,108 +313,84 @@ def list_collections(request: Request) -> Dict[str, Any]:
                 "type": "application/json",
             },
         ]
-    return {
-        "collections": collections,
-        "links": [
-            {
-                "rel": "self",
-                "href": f"{base}{STAC_BASE_PATH}/collections",
-                "type": "application/json",
-            },
-            {
-                "rel": "root",
-                "href": f"{base}{STAC_BASE_PATH}",
-                "type": "application/json",
-            },
-        ],
-    }
+    return STACResponse(
+        {
+            "collections": collections,
+            "links": [
+                {
+                    "rel": "self",
+                    "href": f"{base}{STAC_BASE_PATH}/collections",
+                    "type": "application/json",
+                },
+                {
+                    "rel": "root",
+                    "href": f"{base}{STAC_BASE_PATH}",
+                    "type": "application/json",
+                },
+            ],
+        }
+    )
 
 
 @app.get("/collections", include_in_schema=False)
-def list_collections_root(request: Request) -> Dict[str, Any]:
-    return list_collections(request)
+async def list_collections_root(request: Request) -> STACResponse:
+    return await list_collections(request)
 
 
 @app.get(f"{STAC_BASE_PATH}/collections/{{collection_id}}")
-def get_collection(request: Request, collection_id: str) -> Dict[str, Any]:
-    with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute(
-            "SELECT id, title, description, stac_version, stac_extensions, links, extent FROM collections WHERE id = %s",
-            (collection_id,),
-        )
-        row = cur.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Collection not found")
-        collection = row_to_collection(conn, row)
+async def get_collection(request: Request, collection_id: str) -> STACResponse:
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(f"{COLLECTIONS_SQL} WHERE c.id = $1", collection_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    collection = row_to_collection(row)
     base = str(request.base_url).rstrip("/")
     collection["links"] = collection.get("links", []) + [
         {"rel": "self", "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}"},
         {"rel": "items", "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}/items"},
     ]
-    return collection
+    return STACResponse(collection)
 
 
 @app.get("/collections/{collection_id}", include_in_schema=False)
-def get_collection_root(request: Request, collection_id: str) -> Dict[str, Any]:
-    return get_collection(request, collection_id)
+async def get_collection_root(request: Request, collection_id: str) -> STACResponse:
+    return await get_collection(request, collection_id)
 
 
-def apply_filters(
-    cur,
-    where: List[str],
-    params: List[Any],
-    year: Optional[str],
-    region: Optional[str],
-    zone: Optional[str],
-    bbox: Optional[List[float]],
-):
-    if year:
-        where.append("properties->>'year' = %s")
-        params.append(str(year))
-    if region:
-        where.append("properties->>'region' ILIKE %s")
-        params.append(region)
-    if zone is not None:
-        where.append("properties->>'zone' = %s")
-        params.append(zone)
-    if bbox:
-        where.append("geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
-        params.extend(bbox)
-
-
-def query_items(
+@lru_cache(maxsize=128)
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise HTTPException(status_code=400, detail="bbox must have 4 comma-separated values")
+    try:
+        return (float(parts[0]), float(parts[1]), float(parts[2]), float(parts[3]))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox values must be numeric")
+
+
+async def query_items(
     collection_id: Optional[str],
     year: Optional[str],
     region: Optional[str],
     zone: Optional[str],
-    bbox: Optional[List[float]],
+    bbox: Optional[Sequence[float]],
     limit: int,
 ) -> List[Dict[str, Any]]:
-    where = []
-    params: List[Any] = []
-    if collection_id:
-        where.append("collection_id = %s")
-        params.append(collection_id)
-    apply_filters(None, where, params, year, region, zone, bbox)
-    clause = f"WHERE {' AND '.join(where)}" if where else ""
-    sql = f"""
-        SELECT id, collection_id, stac_version, datetime,
-               ST_AsGeoJSON(geom) AS geom,
-               bbox, properties, assets, links
-        FROM items
-        {clause}
-        ORDER BY id
-        LIMIT %s
-    """
-    params.append(limit)
-    with get_conn() as conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute(sql, params)
-        rows = cur.fetchall()
+    args = [
+        collection_id or None,
+        str(year) if year else None,
+        str(region) if region else None,
+        str(zone) if zone is not None else None,
+        *(bbox if bbox else (None, None, None, None)),
+        limit,
+    ]
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(ITEMS_SQL, *args)
     return [row_to_item(row) for row in rows]
 
 
 @app.get(f"{STAC_BASE_PATH}/collections/{{collection_id}}/items")
-def list_collection_items(
+async def list_collection_items(
     request: Request,
     collection_id: str,
     year: Optional[str] = Query(default=None),
@@ -350,53 +398,49 @@ def list_collection_items(
     zone: Optional[str] = Query(default=None),
     bbox: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=1000),
-) -> Dict[str, Any]:
-    bbox_vals = [float(x) for x in bbox.split(",")] if bbox else None
-    items = query_items(collection_id, year, region, zone, bbox_vals, limit)
+) -> STACResponse:
+    bbox_vals = parse_bbox(bbox) if bbox else None
+    items = await query_items(collection_id, year, region, zone, bbox_vals, limit)
     base = str(request.base_url).rstrip("/")
+    root_href = f"{base}{STAC_BASE_PATH}"
+    collection_href = f"{root_href}/collections/{collection_id}"
+    # Shared by every item; the dicts are only read during serialization.
+    collection_link = {"rel": "collection", "href": collection_href, "type": "application/json"}
+    root_link = {"rel": "root", "href": root_href, "type": "application/json"}
     for item in items:
-        item_id = item["id"]
         item_links = item.get("links") or []
-        item_links.extend(
-            [
+        item_links.append(
+            {
+                "rel": "self",
+                "href": f"{collection_href}/items/{item['id']}",
+                "type": "application/geo+json",
+            }
+        )
+        item_links.append(collection_link)
+        item_links.append(root_link)
+        item["links"] = item_links
+    return STACResponse(
+        {
+            "type": "FeatureCollection",
+            "features": items,
+            "links": [
                 {
                     "rel": "self",
-                    "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}/items/{item_id}",
+                    "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}/items",
                     "type": "application/geo+json",
                 },
-                {
-                    "rel": "collection",
-                    "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}",
-                    "type": "application/json",
-                },
                 {
                     "rel": "root",
                     "href": f"{base}{STAC_BASE_PATH}",
                     "type": "application/json",
                 },
-            ]
-        )
-        item["links"] = item_links
-    return {
-        "type": "FeatureCollection",
-        "features": items,
-        "links": [
-            {
-                "rel": "self",
-                "href": f"{base}{STAC_BASE_PATH}/collections/{collection_id}/items",
-                "type": "application/geo+json",
-            },
-            {
-                "rel": "root",
-                "href": f"{base}{STAC_BASE_PATH}",
-                "type": "application/json",
-            },
-        ],
-    }
+            ],
+        }
+    )
 
 
 @app.get("/collections/{collection_id}/items", include_in_schema=False)
-def list_collection_items_root(
+async def list_collection_items_root(
     request: Request,
     collection_id: str,
     year: Optional[str] = Query(default=None),
@@ -404,8 +448,8 @@ def list_collection_items_root(
     zone: Optional[str] = Query(default=None),
     bbox: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=1000),
-) -> Dict[str, Any]:
-    return list_collection_items(
+) -> STACResponse:
+    return await list_collection_items(
         request, collection_id, year=year, region=region, zone=zone, bbox=bbox, limit=limit
     )
 
@@ -436,11 +480,11 @@ def parse_search_body(body: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @app.post(f"{STAC_BASE_PATH}/search")
-def search_items(body: Dict[str, Any] = Body(default=None)) -> Dict[str, Any]:
+async def search_items(body: Dict[str, Any] = Body(default=None)) -> STACResponse:
     body = body or {}
     parsed = parse_search_body(body)
     collection_id = parsed["collections"][0] if parsed["collections"] else None
-    items = query_items(
+    items = await query_items(
         collection_id,
         parsed["year"],
         parsed["region"],
@@ -451,20 +495,22 @@ def search_items(body: Dict[str, Any] = Body(default=None)) -> Dict[str, Any]:
     base = None
     if "base_url" in body:
         base = str(body["base_url"]).rstrip("/")
-    return {
-        "type": "FeatureCollection",
-        "features": items,
-        "links": [],
-    }
+    return STACResponse(
+        {
+            "type": "FeatureCollection",
+            "features": items,
+            "links": [],
+        }
+    )
 
 
 @app.post("/search", include_in_schema=False)
-def search_items_root(body: Dict[str, Any] = Body(default=None)) -> Dict[str, Any]:
-    return search_items(body)
+async def search_items_root(body: Dict[str, Any] = Body(default=None)) -> STACResponse:
+    return await search_items(body)
 
 
 @app.get(f"{STAC_BASE_PATH}/search")
-def search_items_get(
+async def search_items_get(
     request: Request,
     year: Optional[str] = Query(default=None),
     region: Optional[str] = Query(default=None),
@@ -472,31 +518,33 @@ def search_items_get(
     bbox: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=1000),
     collections: Optional[str] = Query(default=None),
-) -> Dict[str, Any]:
-    bbox_vals = [float(x) for x in bbox.split(",")] if bbox else None
+) -> STACResponse:
+    bbox_vals = parse_bbox(bbox) if bbox else None
     collection_id = collections.split(",")[0] if collections else None
-    items = query_items(collection_id, year, region, zone, bbox_vals, limit)
+    items = await query_items(collection_id, year, region, zone, bbox_vals, limit)
     base = str(request.base_url).rstrip("/")
-    return {
-        "type": "FeatureCollection",
-        "features": items,
-        "links": [
-            {
-                "rel": "self",
-                "href": f"{base}{STAC_BASE_PATH}/search",
-                "type": "application/geo+json",
-            },
-            {
-                "rel": "root",
-                "href": f"{base}{STAC_BASE_PATH}",
-                "type": "application/json",
-            },
-        ],
-    }
+    return STACResponse(
+        {
+            "type": "FeatureCollection",
+            "features": items,
+            "links": [
+                {
+                    "rel": "self",
+                    "href": f"{base}{STAC_BASE_PATH}/search",
+                    "type": "application/geo+json",
+                },
+                {
+                    "rel": "root",
+                    "href": f"{base}{STAC_BASE_PATH}",
+                    "type": "application/json",
+                },
+            ],
+        }
+    )
 
 
 @app.get("/search", include_in_schema=False)
-def search_items_get_root(
+async def search_items_get_root(
     request: Request,
     year: Optional[str] = Query(default=None),
     region: Optional[str] = Query(default=None),
@@ -504,8 +552,8 @@ def search_items_get_root(
     bbox: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=1000),
     collections: Optional[str] = Query(default=None),
-) -> Dict[str, Any]:
-    return search_items_get(
+) -> STACResponse:
+    return await search_items_get(
         request,
         year=year,
         region=region,
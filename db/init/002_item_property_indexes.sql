@@ -0,0 +1,11 @@
+-- Spatial Asset Manager: expression indexes for the STAC API property filters.
+-- Runs via docker-entrypoint-initdb.d on first boot. For an existing database, apply it manually:
+--   docker exec -i spatial-asset-manager-db psql -U sam -d spatial_asset_manager < db/init/002_item_property_indexes.sql
+-- The geom && ST_MakeEnvelope(...) filter is already served by items_geom_gix.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS items_year_idx ON items ((properties->>'year'));
+CREATE INDEX IF NOT EXISTS items_zone_idx ON items ((properties->>'zone'));
+CREATE INDEX IF NOT EXISTS items_region_trgm_idx
+  ON items USING GIN (lower(properties->>'region') gin_trgm_ops);
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Iterator, Tuple
+from typing import Iterator, Optional, Tuple
 
 import numpy as np
 import rasterio
+from PIL import Image
 from rasterio.enums import Resampling
 
 
@@ -47,34 +50,52 @@ def stretch_to_uint8(data: np.ndarray) -> np.ndarray:
         bands = 3
 
     out = np.zeros((bands, height, width), dtype=np.uint8)
-    for idx in range(bands):
-        band = data[idx].astype("float32")
-        if np.isnan(band).all():
-            continue
-        vmin = np.nanpercentile(band, 2)
-        vmax = np.nanpercentile(band, 98)
-        if vmax <= vmin:
-            vmin = np.nanmin(band)
-            vmax = np.nanmax(band)
-        if vmax <= vmin:
-            vmax = vmin + 1.0
-        scaled = (band - vmin) / (vmax - vmin) * 255.0
-        out[idx] = np.clip(scaled, 0, 255).astype("uint8")
+    arr = data.astype(np.float32, copy=False)
+    flat = arr.reshape(bands, -1)
+    valid = ~np.isnan(flat).all(axis=1)
+    if not valid.any():
+        return out
+    if not valid.all():
+        arr = arr[valid]
+        flat = flat[valid]
+
+    vmin, vmax = np.nanpercentile(flat, [2, 98], axis=1).astype(np.float32)
+    narrow = vmax <= vmin
+    if narrow.any():
+        vmin = np.where(narrow, np.nanmin(flat, axis=1), vmin)
+        vmax = np.where(narrow, np.nanmax(flat, axis=1), vmax)
+        vmax = np.where(vmax <= vmin, vmin + 1.0, vmax)
+    scaled = arr - vmin[:, None, None]
+    scaled *= (255.0 / (vmax - vmin))[:, None, None]
+    np.clip(scaled, 0, 255, out=scaled)
+    np.nan_to_num(scaled, copy=False)
+    out[valid] = scaled
     return out
 
 
 def write_jpeg(path: Path, data: np.ndarray) -> None:
-    bands, height, width = data.shape
-    profile = {
-        "driver": "JPEG",
-        "height": height,
-        "width": width,
-        "count": bands,
-        "dtype": "uint8",
-    }
     path.parent.mkdir(parents=True, exist_ok=True)
-    with rasterio.open(path, "w", **profile) as dst:
-        dst.write(data)
+    image = Image.fromarray(np.ascontiguousarray(np.moveaxis(data, 0, -1)))
+    image.save(path, format="JPEG", quality=85)
+
+
+def is_current(thumb_path: Path, src_path: Path) -> bool:
+    return thumb_path.exists() and thumb_path.stat().st_mtime >= src_path.stat().st_mtime
+
+
+def overview_level(src, out_width: int, out_height: int) -> Optional[int]:
+    factor = max(src.width // out_width, src.height // out_height)
+    level = None
+    for idx, decimation in enumerate(src.overviews(1)):
+        if decimation <= factor:
+            level = idx
+    return level
+
+
+def read_thumbnail(src, out_width: int, out_height: int) -> np.ndarray:
+    return src.read(
+        out_shape=(src.count, out_height, out_width), resampling=Resampling.average
+    )
 
 
 def process_asset(
@@ -84,20 +105,39 @@ def process_asset(
     overwrite: bool,
     thumb_square: bool,
 ) -> None:
+    if not overwrite and is_current(thumb_path, src_path):
+        return
     with rasterio.open(src_path) as src:
         if src.crs is None:
             return
-        if overwrite or not thumb_path.exists():
-            out_width, out_height = max_size_to_shape(src.width, src.height, thumb_size)
-            data = src.read(
-                out_shape=(src.count, out_height, out_width), resampling=Resampling.bilinear
-            )
-            data = stretch_to_uint8(data)
-            if thumb_square:
-                data = pad_to_square(data, thumb_size, fill=0)
-            write_jpeg(thumb_path, data)
-
-        return
+        out_width, out_height = max_size_to_shape(src.width, src.height, thumb_size)
+        level = overview_level(src, out_width, out_height)
+        if level is None:
+            data = read_thumbnail(src, out_width, out_height)
+    if level is not None:
+        with rasterio.open(src_path, overview_level=level) as overview:
+            data = read_thumbnail(overview, out_width, out_height)
+    data = stretch_to_uint8(data)
+    if thumb_square:
+        data = pad_to_square(data, thumb_size, fill=0)
+    write_jpeg(thumb_path, data)
+
+
+def init_worker(gdal_cachemax: str) -> None:
+    os.environ["GDAL_CACHEMAX"] = gdal_cachemax
+
+
+def render_thumbnail(
+    path: Path,
+    root: Path,
+    thumb_root: Path,
+    thumb_size: int,
+    overwrite: bool,
+    thumb_square: bool,
+) -> None:
+    rel = path.relative_to(root)
+    thumb_path = thumb_root / rel.with_suffix(".jpg")
+    process_asset(path, thumb_path, thumb_size, overwrite, thumb_square)
 
 
 def main() -> int:
@@ -115,6 +155,17 @@ def main() -> int:
         action="store_true",
         help="Pad thumbnails to a fixed square size (default off).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: CPU count).",
+    )
+    parser.add_argument(
+        "--gdal-cachemax",
+        default=os.getenv("GDAL_CACHEMAX", "256"),
+        help="GDAL block cache size per worker (MB or percentage).",
+    )
     args = parser.parse_args()
 
     if not args.root:
@@ -126,16 +177,21 @@ def main() -> int:
     if thumb_root.exists() and thumb_root.is_file():
         thumb_root.unlink()
     thumb_root.mkdir(parents=True, exist_ok=True)
-    for path in iter_tifs(root, output_root):
-        rel = path.relative_to(root)
-        thumb_path = thumb_root / rel.with_suffix(".jpg")
-        process_asset(
-            path,
-            thumb_path,
-            args.thumb_size,
-            args.overwrite,
-            args.thumb_square,
-        )
+    worker = partial(
+        render_thumbnail,
+        root=root,
+        thumb_root=thumb_root,
+        thumb_size=args.thumb_size,
+        overwrite=args.overwrite,
+        thumb_square=args.thumb_square,
+    )
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=init_worker,
+        initargs=(args.gdal_cachemax,),
+    ) as executor:
+        for _ in executor.map(worker, iter_tifs(root, output_root), chunksize=4):
+            pass
 
     return 0
 
@@ -1,28 +1,64 @@
 #!/usr/bin/env python3
 import argparse
+import csv
+import hashlib
+import io
 import logging
 import os
+import queue
 import re
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 try:
     from dotenv import load_dotenv
 except ImportError:  # optional
     load_dotenv = None
 
-import geopandas as gpd
+import fiona
+import orjson
 import psycopg2
 import psycopg2.extras
 import rasterio
-from rasterio.warp import transform_bounds
-from shapely.geometry import box
+from pyproj import Transformer
+from rasterio.crs import CRS
 
 
-EXTENSIONS = {".tif", ".tiff", ".shp", ".geojson", ".gpkg"}
+EXTENSIONS = (".tif", ".tiff", ".shp", ".geojson", ".gpkg")
 PROJ_EXTENSION = "https://stac-extensions.github.io/projection/v1.0.0/schema.json"
 FILE_EXTENSION = "https://stac-extensions.github.io/file/v2.1.0/schema.json"
+ITEM_COLUMNS = (
+    "id",
+    "collection_id",
+    "title",
+    "description",
+    "stac_extensions",
+    "datetime",
+    "bbox",
+    "properties",
+    "assets",
+    "nas_path",
+)
+MEDIA_TYPES = {
+    ext: sys.intern(media_type)
+    for ext, media_type in (
+        (".tif", "image/tiff; application=geotiff"),
+        (".tiff", "image/tiff; application=geotiff"),
+        (".shp", "application/vnd.shp"),
+        (".geojson", "application/geo+json"),
+        (".gpkg", "application/geopackage+sqlite3"),
+    )
+}
+DEFAULT_MEDIA_TYPE = sys.intern("application/octet-stream")
+QUEUE_SIZE = 2000
+QUEUE_POLL_SECONDS = 0.5
+WORKER_ENVS: List = []
+TRANSFORMERS: Dict[object, Transformer] = {}
 FILENAME_PATTERN = re.compile(
     r"^(?P<year>\d{4})_(?P<region>[A-Za-z0-9]+)(?:_(?P<zone>[A-Za-z0-9]+))?_cog\.tif$",
     re.IGNORECASE,
@@ -45,16 +81,38 @@ def load_env(project_root: Path) -> None:
             os.environ.setdefault(key, value)
 
 
-def iter_asset_paths(root: Path) -> Iterator[Path]:
-    for dirpath, _, filenames in os.walk(root):
-        for name in filenames:
-            ext = Path(name).suffix.lower()
-            if ext in EXTENSIONS:
-                yield Path(dirpath) / name
+def has_prj(shp_path: str) -> bool:
+    stem = shp_path[:-4]
+    return os.path.exists(stem + ".prj") or os.path.exists(stem + ".PRJ")
+
+
+def iter_asset_paths(root: Path) -> Iterator[str]:
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as exc:
+            logging.warning("Cannot list %s: %s", directory, exc)
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                name = entry.name.lower()
+                if not name.endswith(EXTENSIONS) or not entry.is_file():
+                    continue
+                if name.endswith(".shp") and not has_prj(entry.path):
+                    logging.warning("Skipping shapefile without .prj: %s", entry.path)
+                    continue
+                yield entry.path
 
 
-def chunked(items: Iterable[Path], size: int) -> Iterator[List[Path]]:
-    batch: List[Path] = []
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    batch: List = []
     for item in items:
         batch.append(item)
         if len(batch) >= size:
@@ -64,60 +122,56 @@ def chunked(items: Iterable[Path], size: int) -> Iterator[List[Path]]:
         yield batch
 
 
-def detect_media_type(path: Path) -> str:
-    ext = path.suffix.lower()
-    if ext in {".tif", ".tiff"}:
-        return "image/tiff; application=geotiff"
-    if ext == ".shp":
-        return "application/vnd.shp"
-    if ext == ".geojson":
-        return "application/geo+json"
-    if ext == ".gpkg":
-        return "application/geopackage+sqlite3"
-    return "application/octet-stream"
+def detect_media_type(path: str) -> str:
+    return MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), DEFAULT_MEDIA_TYPE)
 
 
-def to_bbox_wkt(bounds: Sequence[float]) -> Tuple[List[float], str]:
-    minx, miny, maxx, maxy = bounds
-    geom = box(minx, miny, maxx, maxy)
-    return [minx, miny, maxx, maxy], geom.wkt
+def to_wgs84(
+    crs: CRS, epsg: Optional[int], minx: float, miny: float, maxx: float, maxy: float
+) -> Tuple[float, float, float, float]:
+    key = epsg if epsg is not None else crs.to_wkt()
+    transformer = TRANSFORMERS.get(key)
+    if transformer is None:
+        transformer = Transformer.from_crs(crs.to_wkt(), "EPSG:4326", always_xy=True)
+        TRANSFORMERS[key] = transformer
+    # items.bbox is a coarse footprint; only projected sources bend enough to
+    # need a few edge samples.
+    densify_pts = 4 if crs.is_projected else 0
+    return transformer.transform_bounds(minx, miny, maxx, maxy, densify_pts=densify_pts)
 
 
-def raster_metadata(path: Path) -> Optional[Tuple[List[float], str, Optional[int]]]:
+def raster_metadata(path: str) -> Optional[Tuple[List[float], Optional[int]]]:
     with rasterio.open(path) as dataset:
         if dataset.crs is None:
             return None
         epsg = dataset.crs.to_epsg()
         bounds = dataset.bounds
-        if dataset.crs.to_epsg() != 4326:
-            bounds = transform_bounds(dataset.crs, "EPSG:4326", *bounds, densify_pts=21)
-        bbox, geom_wkt = to_bbox_wkt(bounds)
-        return bbox, geom_wkt, epsg
+        if epsg != 4326:
+            bounds = to_wgs84(dataset.crs, epsg, *bounds)
+        return list(bounds), epsg
 
 
-def vector_metadata(path: Path) -> Optional[Tuple[List[float], str, Optional[int]]]:
-    gdf = gpd.read_file(path)
-    if gdf.empty or gdf.crs is None:
-        return None
-    epsg = gdf.crs.to_epsg()
-    minx, miny, maxx, maxy = gdf.total_bounds.tolist()
+def vector_metadata(path: str) -> Optional[Tuple[List[float], Optional[int]]]:
+    # Layer envelope and CRS only; features are never materialized in Python.
+    with fiona.open(path) as src:
+        if not src.crs_wkt or len(src) == 0:
+            return None
+        crs = CRS.from_wkt(src.crs_wkt)
+        minx, miny, maxx, maxy = src.bounds
+    epsg = crs.to_epsg()
     if not all(map(lambda v: v == v, [minx, miny, maxx, maxy])):
         return None
-    if gdf.crs.to_epsg() != 4326:
-        minx, miny, maxx, maxy = transform_bounds(
-            gdf.crs, "EPSG:4326", minx, miny, maxx, maxy, densify_pts=21
-        )
-    bbox, geom_wkt = to_bbox_wkt((minx, miny, maxx, maxy))
-    return bbox, geom_wkt, epsg
+    if epsg != 4326:
+        minx, miny, maxx, maxy = to_wgs84(crs, epsg, minx, miny, maxx, maxy)
+    return [minx, miny, maxx, maxy], epsg
 
 
-def fetch_existing_paths(conn, paths: Sequence[str]) -> set:
-    if not paths:
-        return set()
-    with conn.cursor() as cur:
-        cur.execute("SELECT nas_path FROM items WHERE nas_path = ANY(%s)", (list(paths),))
-        rows = cur.fetchall()
-    return {row[0] for row in rows}
+def load_existing_paths(conn, prefix: str) -> Set[str]:
+    pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with conn.cursor(name="existing_paths") as cur:
+        cur.itersize = 10000
+        cur.execute("SELECT nas_path FROM items WHERE nas_path LIKE %s", (pattern,))
+        return {row[0] for row in cur}
 
 
 def ensure_collection(conn, collection_id: str, title: str, description: str, nas_root: str) -> None:
@@ -144,27 +198,71 @@ def ensure_collection(conn, collection_id: str, title: str, description: str, na
     conn.commit()
 
 
+def create_stage_table(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS items_stage AS
+            SELECT {", ".join(ITEM_COLUMNS)} FROM items WITH NO DATA
+            """
+        )
+
+
+def to_pg_array(values: Sequence) -> str:
+    quoted = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'"{value}"' for value in quoted) + "}"
+
+
+def to_copy_record(row: Tuple) -> Tuple:
+    (
+        item_id,
+        collection_id,
+        title,
+        description,
+        stac_extensions,
+        dt,
+        bbox,
+        properties,
+        assets,
+        nas_path,
+    ) = row
+    return (
+        item_id,
+        collection_id,
+        title,
+        description,
+        to_pg_array(stac_extensions),
+        dt.isoformat(),
+        to_pg_array(bbox),
+        orjson.dumps(properties).decode(),
+        orjson.dumps(assets).decode(),
+        nas_path,
+    )
+
+
 def insert_items(conn, rows: List[Tuple]) -> None:
     if not rows:
         return
-    query = """
-        INSERT INTO items (
-          id, collection_id, title, description, stac_version, stac_extensions,
-          datetime, geom, bbox, properties, assets, links, nas_path, extra_fields
-        )
-        VALUES %s
-        ON CONFLICT (id) DO NOTHING
-    """
-    template = (
-        "(%s, %s, %s, %s, %s, %s, %s, ST_GeomFromText(%s, 4326), %s, %s, %s, %s, %s, %s)"
-    )
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(to_copy_record(row) for row in rows)
+    buffer.seek(0)
+    columns = ", ".join(ITEM_COLUMNS)
     with conn.cursor() as cur:
-        psycopg2.extras.execute_values(cur, query, rows, template=template, page_size=200)
-    conn.commit()
+        cur.copy_expert(f"COPY items_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cur.execute(
+            f"""
+            INSERT INTO items ({columns}, stac_version, links, extra_fields, geom)
+            SELECT {columns}, '1.0.0', '[]'::jsonb, '{{}}'::jsonb,
+                   ST_ForcePolygonCCW(ST_MakeEnvelope(bbox[1], bbox[2], bbox[3], bbox[4], 4326))
+            FROM items_stage
+            ON CONFLICT (id) DO NOTHING
+            """
+        )
+        cur.execute("TRUNCATE items_stage")
 
 
-def parse_filename(path: Path) -> Optional[Dict[str, str]]:
-    match = FILENAME_PATTERN.match(path.name)
+def parse_filename(name: str) -> Optional[Dict[str, str]]:
+    match = FILENAME_PATTERN.match(name)
     if not match:
         return None
     zone = match.group("zone") or ""
@@ -181,24 +279,18 @@ def to_public_href(base_url: str, rel_path: str) -> str:
     return f"{base_url.rstrip('/')}/{rel_path.lstrip('/')}"
 
 
-def derive_paths(rel_path: Path, deriv_root: Path) -> Dict[str, Path]:
-    return {
-        "thumbnail": deriv_root / "thumb" / rel_path.with_suffix(".jpg"),
-    }
-
-
 def build_item_row(
-    path: Path,
+    path: str,
     rel_path: str,
     nas_path: str,
     collection_id: str,
     bbox: List[float],
-    geom_wkt: str,
     epsg: Optional[int],
     base_url: str,
     deriv_root: Path,
 ) -> Tuple:
-    stat = path.stat()
+    stat = os.stat(path)
+    title = path[path.rfind(os.sep) + 1 :]
     media_type = detect_media_type(path)
     stac_extensions = []
     properties = {}
@@ -208,14 +300,13 @@ def build_item_row(
     properties["file:size"] = stat.st_size
     stac_extensions.append(FILE_EXTENSION)
 
-    parsed = parse_filename(path)
+    parsed = parse_filename(title)
     if parsed:
         properties["year"] = int(parsed["year"])
         properties["region"] = parsed["region"]
         properties["zone"] = parsed["zone"]
 
-    rel_path_posix = Path(rel_path).as_posix()
-    ortho_href = to_public_href(base_url, rel_path_posix)
+    ortho_href = to_public_href(base_url, rel_path)
 
     assets = {
         "data": {
@@ -225,40 +316,151 @@ def build_item_row(
         }
     }
 
-    derived = derive_paths(Path(rel_path), deriv_root)
-    thumb_path = derived["thumbnail"]
-    if thumb_path.exists():
+    thumb_rel = rel_path[: rel_path.rfind(".")] + ".jpg"
+    if os.path.exists(os.path.join(deriv_root, "thumb", thumb_rel)):
         assets["thumbnail"] = {
-            "href": to_public_href(base_url, f"result/thumb/{Path(rel_path).with_suffix('.jpg').as_posix()}"),
+            "href": to_public_href(base_url, f"result/thumb/{thumb_rel}"),
             "type": "image/jpeg",
             "roles": ["thumbnail"],
         }
-    item_id = path.stem
-    title = path.name
-    description = f"Indexed asset at {rel_path_posix}"
+    item_id = title[: title.rfind(".")]
+    description = f"Indexed asset at {rel_path}"
     dt = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
     return (
         item_id,
         collection_id,
         title,
         description,
-        "1.0.0",
         stac_extensions,
         dt,
-        geom_wkt,
         bbox,
-        psycopg2.extras.Json(properties),
-        psycopg2.extras.Json(assets),
-        psycopg2.extras.Json([]),
+        properties,
+        assets,
         nas_path,
-        psycopg2.extras.Json({}),
     )
 
 
-def hash_path(path: str) -> str:
-    import hashlib
+def init_worker() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Opening datasets outside an Env makes rasterio/fiona build and tear down a
+    # GDAL environment per call; keep one alive for the worker's lifetime instead.
+    WORKER_ENVS.extend([rasterio.Env(), fiona.Env()])
+    for env in WORKER_ENVS:
+        env.__enter__()
+
 
-    return hashlib.sha1(path.encode("utf-8")).hexdigest()
+def extract_item_row(
+    path: str,
+    rel_path: str,
+    nas_path: str,
+    collection_id: str,
+    base_url: str,
+    deriv_root: Path,
+) -> Optional[Tuple]:
+    try:
+        if path[path.rfind(".") :].lower() in {".tif", ".tiff"}:
+            meta = raster_metadata(path)
+        else:
+            meta = vector_metadata(path)
+        if meta is None:
+            logging.warning("Skipping (missing CRS or bounds): %s", path)
+            return None
+        bbox, epsg = meta
+        return build_item_row(
+            path,
+            rel_path,
+            nas_path,
+            collection_id,
+            bbox,
+            epsg,
+            base_url,
+            deriv_root,
+        )
+    except Exception as exc:
+        logging.exception("Failed to read metadata for %s: %s", path, exc)
+        return None
+
+
+def extract_item_rows(
+    tasks: List[Tuple[str, str, str]],
+    collection_id: str,
+    base_url: str,
+    deriv_root: Path,
+) -> List[Tuple]:
+    rows: List[Tuple] = []
+    for path, rel_path, nas_path in tasks:
+        row = extract_item_row(path, rel_path, nas_path, collection_id, base_url, deriv_root)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def walk_assets(root: Path, paths_q: queue.Queue, errors: List[BaseException]) -> None:
+    try:
+        for path in iter_asset_paths(root):
+            paths_q.put(path)
+    except Exception as exc:
+        errors.append(exc)
+    finally:
+        paths_q.put(None)
+
+
+def insert_rows(
+    conn,
+    rows_q: queue.Queue,
+    insert_batch_size: int,
+    commit_every: int,
+    errors: List[BaseException],
+) -> None:
+    rows = iter(rows_q.get, None)
+    try:
+        pending_rows: List[Tuple] = []
+        uncommitted = 0
+        for row in rows:
+            pending_rows.append(row)
+            if len(pending_rows) >= insert_batch_size:
+                insert_items(conn, pending_rows)
+                uncommitted += len(pending_rows)
+                pending_rows.clear()
+                if uncommitted >= commit_every:
+                    conn.commit()
+                    uncommitted = 0
+        insert_items(conn, pending_rows)
+        conn.commit()
+    except Exception as exc:
+        errors.append(exc)
+        # Keep draining so the producer never blocks on a full queue.
+        for _ in rows:
+            pass
+
+
+def take_batch(paths_q: queue.Queue, size: int) -> Tuple[List[str], bool]:
+    batch: List[str] = []
+    try:
+        path = paths_q.get(timeout=QUEUE_POLL_SECONDS)
+        while path is not None:
+            batch.append(path)
+            if len(batch) >= size:
+                return batch, False
+            path = paths_q.get_nowait()
+    except queue.Empty:
+        return batch, False
+    return batch, True
+
+
+def forward_rows(futures: Iterable[Future], rows_q: Optional[queue.Queue]) -> int:
+    count = 0
+    for future in futures:
+        rows = future.result()
+        count += len(rows)
+        if rows_q is not None:
+            for row in rows:
+                rows_q.put(row)
+    return count
+
+
+def hash_path(path: str) -> str:
+    return hashlib.blake2b(path.encode("utf-8"), digest_size=16).hexdigest()
 
 
 def main() -> int:
@@ -283,8 +485,21 @@ def main() -> int:
         default=os.getenv("DERIV_ROOT", ""),
         help="Root folder for thumbnails",
     )
-    parser.add_argument("--batch-size", type=int, default=200, help="DB existence check batch size")
-    parser.add_argument("--insert-batch-size", type=int, default=100, help="Insert batch size")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Max paths filtered per batch")
+    parser.add_argument("--paths-per-task", type=int, default=16, help="Paths handed to a worker per task")
+    parser.add_argument("--insert-batch-size", type=int, default=1000, help="Insert batch size")
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=10000,
+        help="Commit after at least this many inserted rows",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Metadata extraction processes (default: CPU count)",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Scan and report without inserting")
     args = parser.parse_args()
 
@@ -313,63 +528,80 @@ def main() -> int:
         nas_root=str(root),
     )
 
+    if not args.dry_run:
+        create_stage_table(conn)
+
     total_scanned = 0
     total_inserted = 0
     total_skipped = 0
 
-    pending_rows: List[Tuple] = []
-
-    for batch in chunked(iter_asset_paths(root), args.batch_size):
-        batch_paths = [str(path) for path in batch]
-        existing = fetch_existing_paths(conn, batch_paths)
-        for path in batch:
-            total_scanned += 1
-            if str(path) in existing:
-                total_skipped += 1
-                continue
-
-            rel_path_raw = os.path.relpath(path, root)
-            if rel_path_raw.startswith(".."):
-                rel_path_raw = path.name
-            rel_path = Path(rel_path_raw).as_posix()
-            nas_path = str(Path(nas_host_root) / rel_path)
-            try:
-                if path.suffix.lower() in {".tif", ".tiff"}:
-                    meta = raster_metadata(path)
-                else:
-                    meta = vector_metadata(path)
-                if meta is None:
-                    logging.warning("Skipping (missing CRS or bounds): %s", path)
-                    continue
-                bbox, geom_wkt, epsg = meta
-                row = build_item_row(
-                    path,
-                    rel_path,
-                    nas_path,
-                    args.collection_id,
-                    bbox,
-                    geom_wkt,
-                    epsg,
-                    args.public_base_url,
-                    deriv_root,
-                )
-            except Exception as exc:
-                logging.exception("Failed to read metadata for %s: %s", path, exc)
-                continue
-
-            if args.dry_run:
-                total_inserted += 1
-                continue
-
-            pending_rows.append(row)
-            if len(pending_rows) >= args.insert_batch_size:
-                insert_items(conn, pending_rows)
-                total_inserted += len(pending_rows)
-                pending_rows.clear()
+    # iter_asset_paths yields paths under root, so relative and NAS paths are
+    # plain prefix arithmetic.
+    root_prefix = os.path.join(str(root), "")
+    nas_host_prefix = str(Path(nas_host_root)).rstrip("/") + "/"
+    existing = load_existing_paths(conn, nas_host_prefix)
+    logging.info("Found %s already indexed paths", len(existing))
+
+    # Walking, metadata extraction and inserts run concurrently; the bounded
+    # queues keep a slow stage from letting the others buffer the whole tree.
+    errors: List[BaseException] = []
+    paths_q: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    rows_q: Optional[queue.Queue] = None
+    inserter = None
+    threading.Thread(target=walk_assets, args=(root, paths_q, errors), daemon=True).start()
+    if not args.dry_run:
+        rows_q = queue.Queue(maxsize=QUEUE_SIZE)
+        inserter = threading.Thread(
+            target=insert_rows,
+            args=(conn, rows_q, args.insert_batch_size, args.commit_every, errors),
+        )
+        inserter.start()
 
-    if not args.dry_run and pending_rows:
-        insert_items(conn, pending_rows)
-        total_inserted += len(pending_rows)
+    worker = partial(
+        extract_item_rows,
+        collection_id=args.collection_id,
+        base_url=args.public_base_url,
+        deriv_root=deriv_root,
+    )
+    max_in_flight = (args.workers or os.cpu_count() or 1) * 4
+    in_flight: Set[Future] = set()
+    try:
+        # Recycle workers periodically so GDAL/Fiona memory does not build up on long scans.
+        with ProcessPoolExecutor(
+            max_workers=args.workers, initializer=init_worker, max_tasks_per_child=200
+        ) as executor:
+            walked = False
+            while not walked and not errors:
+                # Hand finished rows to the inserter before waiting on the walker,
+                # so a slow directory listing does not leave workers' output idle.
+                done, in_flight = wait(in_flight, timeout=0)
+                total_inserted += forward_rows(done, rows_q)
+                batch, walked = take_batch(paths_q, args.batch_size)
+                tasks: List[Tuple[str, str, str]] = []
+                for path in batch:
+                    rel_path = path[len(root_prefix) :]
+                    if os.sep != "/":
+                        rel_path = rel_path.replace(os.sep, "/")
+                    nas_path = nas_host_prefix + rel_path
+                    if nas_path in existing:
+                        continue
+                    tasks.append((path, rel_path, nas_path))
+                total_scanned += len(batch)
+                total_skipped += len(batch) - len(tasks)
+                for task in chunked(tasks, args.paths_per_task):
+                    in_flight.add(executor.submit(worker, task))
+                    if len(in_flight) >= max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        total_inserted += forward_rows(done, rows_q)
+            total_inserted += forward_rows(in_flight, rows_q)
+    finally:
+        # Always release the inserter, or a broken pool or Ctrl-C leaves it
+        # blocked on the queue and the interpreter never exits.
+        if inserter is not None:
+            rows_q.put(None)
+            inserter.join()
+    if errors:
+        raise errors[0]
 
     logging.info(
         "Done. scanned=%s inserted=%s skipped=%s",